@@ -6,7 +6,12 @@ from minari.storage.hosting import (
     list_remote_datasets,
     upload_dataset,
 )
-from minari.storage.local import delete_dataset, list_local_datasets, load_dataset
+from minari.storage.local import (
+    delete_dataset,
+    list_local_dataset_ids,
+    list_local_datasets,
+    load_dataset,
+)
 from minari.utils import (
     combine_datasets,
     create_dataset_from_buffers,
@@ -30,6 +35,7 @@ __all__ = [
     "upload_dataset",
     "delete_dataset",
     "list_local_datasets",
+    "list_local_dataset_ids",
     "load_dataset",
     "combine_datasets",
     "create_dataset_from_buffers",
@@ -2,16 +2,24 @@ from __future__ import annotations
 
 import os
 import re
+import sys
 from dataclasses import dataclass, field
 from typing import Callable, Iterable, Iterator, List, Optional, Union
 
 import gymnasium as gym
+import h5py
 import numpy as np
 from gymnasium import error
 from gymnasium.envs.registration import EnvSpec
 
 from minari.data_collector import DataCollectorV0
-from minari.dataset.minari_storage import MinariStorage, PathLike
+from minari.dataset.minari_storage import (
+    EPISODES_LAYOUT,
+    LAYOUT_ATTR,
+    MinariStorage,
+    PathLike,
+)
+from minari.dataset.minari_storage_soa import SOA_LAYOUT, MinariStorageSoA
 
 
 DATASET_ID_RE = re.compile(
@@ -41,7 +49,28 @@ def parse_dataset_id(dataset_id: str) -> tuple[str | None, str, int]:
     return env_name, dataset_name, version
 
 
-@dataclass(frozen=True)
+def load_storage(data_path: PathLike, in_memory: bool = False) -> MinariStorage:
+    """Load the storage of a dataset file with the storage class of the file layout.
+
+    Args:
+        data_path (str): full path to the `main_data.hdf5` file of the dataset
+        in_memory (bool): if `True` the whole file is loaded into memory. Default to `False`.
+
+    Returns:
+        MinariStorage: storage of the dataset, a :class:`MinariStorageSoA` for the files in the SoA layout
+    """
+    with h5py.File(data_path, "r") as f:
+        layout = f.attrs.get(LAYOUT_ATTR, EPISODES_LAYOUT)
+    if layout == SOA_LAYOUT:
+        return MinariStorageSoA(data_path, in_memory=in_memory)
+    return MinariStorage(data_path, in_memory=in_memory)
+
+
+# Slotted dataclasses are only available from Python 3.10
+_SLOTS_KWARGS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS_KWARGS)
 class EpisodeData:
     """Contains the datasets data for a single episode.
 
@@ -96,10 +125,10 @@ class MinariDatasetSpec:
     total_steps: int
     dataset_id: str
     combined_datasets: List[str]
-    observation_space: gym.Space
-    action_space: gym.Space
     data_path: str
     minari_version: str
+    # storage the observation and action spaces are read from on first access
+    _data: MinariStorage = field(repr=False, compare=False)
 
     # post-init attributes
     env_name: str | None = field(init=False)
@@ -112,6 +141,16 @@ class MinariDatasetSpec:
             self.dataset_id
         )
 
+    @property
+    def observation_space(self) -> gym.Space:
+        """Observation space of the dataset, the environment is instantiated on first access if the dataset doesn't store it."""
+        return self._data.observation_space
+
+    @property
+    def action_space(self) -> gym.Space:
+        """Action space of the dataset, the environment is instantiated on first access if the dataset doesn't store it."""
+        return self._data.action_space
+
 
 class MinariDataset:
     """Main Minari dataset class to sample data and get metadata information from a dataset."""
@@ -134,7 +173,7 @@ class MinariDataset:
             or isinstance(data, os.PathLike)
             or isinstance(data, bytes)
         ):
-            self._data = MinariStorage(data)
+            self._data = load_storage(data)
         else:
             raise ValueError(f"Unrecognized type {type(data)} for data")
 
@@ -160,10 +199,9 @@ class MinariDataset:
             total_steps=total_steps,
             dataset_id=self._data.id,
             combined_datasets=self._data.combined_datasets,
-            observation_space=self._data.observation_space,
-            action_space=self._data.action_space,
             data_path=str(self._data.data_path),
             minari_version=str(self._data.minari_version),
+            _data=self._data,
         )
         self._total_steps = total_steps
         self._generator = np.random.default_rng()
@@ -326,6 +364,23 @@ class MinariDataset:
             )
         )
 
+    def close(self):
+        """Release the dataset file kept open by the storage, e.g. the memory of a dataset loaded with `in_memory=True`.
+
+        Datasets obtained with :meth:`filter_episodes` share the storage of the original dataset, and they are also
+        released. The dataset can still be read after closing it, the file is then opened for each read.
+        Using the dataset in a `with` block keeps the file open for the reads of the block, an in-memory dataset
+        stays loaded after the block until it is closed.
+        """
+        self._data.close()
+
+    def __enter__(self) -> MinariDataset:
+        self._data.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._data.__exit__(exc_type, exc_value, traceback)
+
     def __iter__(self):
         return self.iterate_episodes()
 
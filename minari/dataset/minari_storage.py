@@ -1,8 +1,20 @@
+import copy
+import functools
 import importlib.metadata
-import json
 import os
 from collections import OrderedDict
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import gymnasium as gym
 import h5py
@@ -20,18 +32,84 @@ __version__ = importlib.metadata.version("minari")
 
 PathLike = Union[str, bytes, os.PathLike]
 
+# Decodes the same space element from a list of HDF5 groups or datasets, one per episode
+SpaceReader = Callable[..., List[Union[Dict, Tuple, List, np.ndarray]]]
+
+# Attribute of the main HDF5 file with the layout of the episodes data. Files without it are in the
+# default layout, with an `episode_{id}` group per episode
+LAYOUT_ATTR = "storage_layout"
+EPISODES_LAYOUT = "episodes"
+
+# Preemption policy of the chunk cache, values closer to 1 evict first the chunks that have been fully read
+RDCC_W0 = 0.75
+
+# Typical size of the chunks h5py picks for the `chunks=True` episode datasets, used to size the cache hash table
+RDCC_CHUNK_BYTES = 16 * 1024
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_env_spec(env_spec_json: str) -> EnvSpec:
+    """Parse a serialized environment spec, reusing the result for datasets that share the same spec.
+
+    The returned spec is shared by all the callers and must not be modified, use :func:`_load_env_spec` instead.
+    """
+    return EnvSpec.from_json(env_spec_json)
+
+
+def _load_env_spec(env_spec_json: str) -> EnvSpec:
+    """Get a new environment spec from its serialized version.
+
+    The parsed spec is cached and each call returns its own copy, so that changes to the spec of one dataset,
+    e.g. by `gym.make`, don't leak into the other datasets that load the same spec.
+
+    Args:
+        env_spec_json (str): environment spec serialized with `EnvSpec.to_json`
+
+    Returns:
+        EnvSpec: environment spec
+    """
+    env_spec = copy.copy(_cached_env_spec(env_spec_json))
+    # The rest of the fields are immutable
+    env_spec.kwargs = copy.deepcopy(env_spec.kwargs)
+    env_spec.additional_wrappers = copy.deepcopy(env_spec.additional_wrappers)
+    return env_spec
+
 
 class MinariStorage:
-    def __init__(self, data_path: PathLike):
+    # Layout of the dataset files read by the storage
+    _layout: str = EPISODES_LAYOUT
+
+    def __init__(
+        self,
+        data_path: PathLike,
+        rdcc_nbytes: Optional[int] = None,
+        in_memory: bool = False,
+    ):
         """Initialize properties of the Minari storage.
 
         Args:
             data_path (str): full path to the `main_data.hdf5` file of the dataset.
+            rdcc_nbytes (Optional[int]): size in bytes of the HDF5 raw data chunk cache of each dataset read. HDF5 sets up a cache per dataset, so a larger cache only pays off for datasets with chunks larger than the 1 MiB default. Default to `None`, the h5py default.
+            in_memory (bool): if `True` the whole file is loaded into memory once and kept open for all the reads until :meth:`close` is called. The loaded file is a snapshot that doesn't see the changes made by other storages. Default to `False`.
         """
         self._data_path = data_path
+        self._rdcc_nbytes = rdcc_nbytes
+        self._rdcc_nslots = None if rdcc_nbytes is None else _rdcc_nslots(rdcc_nbytes)
+        self._in_memory = in_memory
+        self._file: Optional[h5py.File] = None
+        self._open_depth = 0
+        self._ep_groups: Dict[int, h5py.Group] = {}
+        self._observation_reader: Optional[SpaceReader] = None
+        self._action_reader: Optional[SpaceReader] = None
         self._extra_data_id = 0
         with h5py.File(self._data_path, "r") as f:
-            self._env_spec = EnvSpec.from_json(f.attrs["env_spec"])
+            layout = f.attrs.get(LAYOUT_ATTR, EPISODES_LAYOUT)
+            if layout != self._layout:
+                raise ValueError(
+                    f"The dataset file {data_path} is stored in the {layout} layout, which can't be read by {type(self).__name__}."
+                )
+
+            self._env_spec = _load_env_spec(f.attrs["env_spec"])
 
             total_episodes = f.attrs["total_episodes"].item()
             assert isinstance(total_episodes, int)
@@ -61,28 +139,17 @@ class MinariStorage:
 
             # We will default to using the reconstructed observation and action spaces from the dataset
             # and fall back to the env spec env if the action and observation spaces are not both present
-            # in the dataset.
+            # in the dataset. The environment is only instantiated on first access to the spaces.
+            self._observation_space = None
+            self._action_space = None
             if "action_space" in f.attrs and "observation_space" in f.attrs:
                 self._observation_space = deserialize_space(
                     f.attrs["observation_space"]
                 )
                 self._action_space = deserialize_space(f.attrs["action_space"])
-            else:
-                # Checking if the base library of the environment is present in the environment
-                entry_point = json.loads(f.attrs["env_spec"])["entry_point"]
-                lib_full_path = entry_point.split(":")[0]
-                base_lib = lib_full_path.split(".")[0]
-                env_name = self._env_spec.id
-
-                try:
-                    env = gym.make(self._env_spec)
-                    self._observation_space = env.observation_space
-                    self._action_space = env.action_space
-                    env.close()
-                except ModuleNotFoundError as e:
-                    raise ModuleNotFoundError(
-                        f"Install {base_lib} for loading {env_name} data"
-                    ) from e
+
+        if self._in_memory:
+            self._open()
 
     def apply(
         self,
@@ -100,55 +167,148 @@ class MinariStorage:
         """
         if episode_indices is None:
             episode_indices = range(self.total_episodes)
-        out = []
-        with h5py.File(self._data_path, "r") as file:
-            for ep_idx in episode_indices:
-                ep_group = file[f"episode_{ep_idx}"]
-                assert isinstance(ep_group, h5py.Group)
-                ep_dict = {
-                    "id": ep_group.attrs.get("id"),
-                    "total_timesteps": ep_group.attrs.get("total_steps"),
-                    "seed": ep_group.attrs.get("seed"),
-                    "observations": self._decode_space(
-                        ep_group["observations"], self.observation_space
-                    ),
-                    "actions": self._decode_space(
-                        ep_group["actions"], self.action_space
-                    ),
-                    "rewards": ep_group["rewards"][()],
-                    "terminations": ep_group["terminations"][()],
-                    "truncations": ep_group["truncations"][()],
-                }
-                out.append(function(ep_dict))
+
+        with self._read_file() as file:
+            ep_groups = self._episode_groups(file, episode_indices)
+            out: List[Any] = [None] * len(ep_groups)
+            for k, ep_group in enumerate(ep_groups):
+                out[k] = function(self._read_episode(ep_group))
 
         return out
 
-    def _decode_space(
-        self,
-        hdf_ref: Union[h5py.Group, h5py.Dataset],
-        space: gym.spaces.Space,
-    ) -> Union[Dict, Tuple, List, np.ndarray]:
-        if isinstance(space, gym.spaces.Tuple):
-            assert isinstance(hdf_ref, h5py.Group)
-            result = []
-            for i in range(len(hdf_ref.keys())):
-                result.append(
-                    self._decode_space(hdf_ref[f"_index_{i}"], space.spaces[i])
+    def _make_space_reader(self, space: gym.spaces.Space) -> SpaceReader:
+        """Build the reader of the data of a space in the storage layout, see :func:`_space_reader`."""
+        return _space_reader(space)
+
+    @property
+    def _space_readers(self) -> Tuple[SpaceReader, SpaceReader]:
+        """Readers of the observations and actions specialized for the dataset spaces, built on first use."""
+        if self._observation_reader is None or self._action_reader is None:
+            self._observation_reader = self._make_space_reader(self.observation_space)
+            self._action_reader = self._make_space_reader(self.action_space)
+        return self._observation_reader, self._action_reader
+
+    def _read_episode(self, ep_group: h5py.Group) -> dict:
+        """Read all the data of a single episode group."""
+        assert isinstance(ep_group, h5py.Group)
+        read_observations, read_actions = self._space_readers
+        return {
+            "id": ep_group.attrs.get("id"),
+            "total_timesteps": ep_group.attrs.get("total_steps"),
+            "seed": ep_group.attrs.get("seed"),
+            "observations": read_observations([ep_group["observations"]])[0],
+            "actions": read_actions([ep_group["actions"]])[0],
+            "rewards": ep_group["rewards"][()],
+            "terminations": ep_group["terminations"][()],
+            "truncations": ep_group["truncations"][()],
+        }
+
+    def _open_for_read(self, in_memory: bool = False) -> h5py.File:
+        """Open the dataset file in read mode, with the chunk cache size requested for the storage if any.
+
+        Args:
+            in_memory (bool): if `True` load the whole file into memory. Default to `False`.
+        """
+        file_kwargs: Dict[str, Any] = {}
+        if self._rdcc_nbytes is not None:
+            file_kwargs = {
+                "rdcc_nbytes": self._rdcc_nbytes,
+                "rdcc_nslots": self._rdcc_nslots,
+                "rdcc_w0": RDCC_W0,
+            }
+        if in_memory:
+            # Read the whole file into memory without ever writing it back. The in-memory handle
+            # outlives single reads, so it doesn't lock the file against other writers
+            file_kwargs.update(driver="core", backing_store=False, locking=False)
+        return h5py.File(self._data_path, "r", **file_kwargs)
+
+    def _open(self):
+        """Open the dataset file and keep the handle for subsequent reads until :meth:`close` is called."""
+        if self._file is None:
+            self._file = self._open_for_read(in_memory=self._in_memory)
+
+    def close(self):
+        """Close the dataset file handle kept open by the storage, if any.
+
+        For in-memory storages this releases the memory of the loaded file, and the following reads
+        open the file on disk for each read, as for the other storages.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._ep_groups = {}
+
+    def __enter__(self) -> "MinariStorage":
+        self._open()
+        self._open_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._open_depth -= 1
+        # Nested blocks keep the handle of the outermost one, and in-memory storages keep
+        # their file loaded until they are explicitly closed
+        if self._open_depth == 0 and not self._in_memory:
+            self.close()
+
+    def _check_episode_indices(self, episode_indices: Iterable[int]) -> List[int]:
+        """Check that the episode indices are within the dataset.
+
+        Args:
+            episode_indices (Iterable[int]): episode indices
+
+        Returns:
+            List[int]: the episode indices
+
+        Raises:
+            KeyError: if an index is out of the `[0, total_episodes)` range
+        """
+        episode_indices = list(episode_indices)
+        for ep_idx in episode_indices:
+            if not 0 <= ep_idx < self.total_episodes:
+                raise KeyError(
+                    f"Episode {ep_idx} not found in dataset {self.id} with {self.total_episodes} episodes"
                 )
-            return tuple(result)
-        elif isinstance(space, gym.spaces.Dict):
-            assert isinstance(hdf_ref, h5py.Group)
-            result = {}
-            for key in hdf_ref:
-                result[key] = self._decode_space(hdf_ref[key], space.spaces[key])
-            return result
-        elif isinstance(space, gym.spaces.Text):
-            assert isinstance(hdf_ref, h5py.Dataset)
-            result = map(lambda string: string.decode("utf-8"), hdf_ref[()])
-            return list(result)
+        return episode_indices
+
+    def _episode_groups(
+        self, file: h5py.File, episode_indices: Iterable[int]
+    ) -> List[h5py.Group]:
+        """Get the HDF5 groups of the given episodes.
+
+        The groups of the file handle kept open by the storage are resolved the first time they
+        are requested and reused, so repeated reads skip the path lookup of each `episode_{id}` group.
+        """
+        episode_indices = self._check_episode_indices(episode_indices)
+        if file is not self._file:
+            return [file[f"episode_{ep_idx}"] for ep_idx in episode_indices]
+
+        ep_groups = []
+        for ep_idx in episode_indices:
+            ep_group = self._ep_groups.get(ep_idx)
+            if ep_group is None:
+                ep_group = self._ep_groups[ep_idx] = file[f"episode_{ep_idx}"]
+            ep_groups.append(ep_group)
+        return ep_groups
+
+    @contextmanager
+    def _read_file(self) -> Iterator[h5py.File]:
+        """Yield the open file handle if there is one, otherwise open the file only for the duration of the read."""
+        if self._file is not None:
+            yield self._file
         else:
-            assert isinstance(hdf_ref, h5py.Dataset)
-            return hdf_ref[()]
+            with self._open_for_read() as file:
+                yield file
+
+    @contextmanager
+    def _reopen_after_write(self) -> Iterator[None]:
+        """Release the open read handle while the dataset file is being modified and restore it afterwards."""
+        was_open = self._file is not None
+        self.close()
+        try:
+            yield
+        finally:
+            if was_open:
+                self._open()
 
     def get_episodes(self, episode_indices: Iterable[int]) -> List[dict]:
         """Get a list of episodes.
@@ -159,26 +319,34 @@ class MinariStorage:
         Returns:
             episodes (List[dict]): list of episodes data
         """
-        out = []
-        with h5py.File(self._data_path, "r") as file:
-            for ep_idx in episode_indices:
-                ep_group = file[f"episode_{ep_idx}"]
-                out.append(
-                    {
-                        "id": ep_group.attrs.get("id"),
-                        "total_timesteps": ep_group.attrs.get("total_steps"),
-                        "seed": ep_group.attrs.get("seed"),
-                        "observations": self._decode_space(
-                            ep_group["observations"], self.observation_space
-                        ),
-                        "actions": self._decode_space(
-                            ep_group["actions"], self.action_space
-                        ),
-                        "rewards": ep_group["rewards"][()],
-                        "terminations": ep_group["terminations"][()],
-                        "truncations": ep_group["truncations"][()],
-                    }
-                )
+        with self._read_file() as file:
+            ep_groups = self._episode_groups(file, episode_indices)
+            read_observations, read_actions = self._space_readers
+            observations = read_observations(
+                [ep_group["observations"] for ep_group in ep_groups]
+            )
+            actions = read_actions([ep_group["actions"] for ep_group in ep_groups])
+            rewards = _read_arrays([ep_group["rewards"] for ep_group in ep_groups])
+            terminations = _read_arrays(
+                [ep_group["terminations"] for ep_group in ep_groups]
+            )
+            truncations = _read_arrays(
+                [ep_group["truncations"] for ep_group in ep_groups]
+            )
+
+            out = [
+                {
+                    "id": ep_group.attrs.get("id"),
+                    "total_timesteps": ep_group.attrs.get("total_steps"),
+                    "seed": ep_group.attrs.get("seed"),
+                    "observations": observations[i],
+                    "actions": actions[i],
+                    "rewards": rewards[i],
+                    "terminations": terminations[i],
+                    "truncations": truncations[i],
+                }
+                for i, ep_group in enumerate(ep_groups)
+            ]
 
         return out
 
@@ -195,7 +363,9 @@ class MinariStorage:
             new_data_total_episodes = new_data_file.attrs["total_episodes"]
             new_data_total_steps = new_data_file.attrs["total_steps"]
 
-        with h5py.File(self.data_path, "a", track_order=True) as file:
+        with self._reopen_after_write(), h5py.File(
+            self.data_path, "a", track_order=True
+        ) as file:
             last_episode_id = file.attrs["total_episodes"]
             for id in range(new_data_total_episodes):
                 file[f"episode_{last_episode_id + id}"] = h5py.ExternalLink(
@@ -216,7 +386,9 @@ class MinariStorage:
 
     def update_from_buffer(self, buffer: List[dict], data_path: str):
         additional_steps = 0
-        with h5py.File(data_path, "a", track_order=True) as file:
+        with self._reopen_after_write(), h5py.File(
+            data_path, "a", track_order=True
+        ) as file:
             last_episode_id = file.attrs["total_episodes"]
             for i, eps_buff in enumerate(buffer):
                 episode_id = last_episode_id + i
@@ -255,14 +427,37 @@ class MinariStorage:
 
             self._total_episodes = int(file.attrs["total_episodes"].item())
 
+    def _load_spaces_from_env(self):
+        """Recover the observation and action spaces by instantiating the environment from its spec."""
+        # Checking if the base library of the environment is present in the environment
+        entry_point = self._env_spec.entry_point
+        assert isinstance(entry_point, str)
+        lib_full_path = entry_point.split(":")[0]
+        base_lib = lib_full_path.split(".")[0]
+        env_name = self._env_spec.id
+
+        try:
+            env = gym.make(self._env_spec)
+            self._observation_space = env.observation_space
+            self._action_space = env.action_space
+            env.close()
+        except ModuleNotFoundError as e:
+            raise ModuleNotFoundError(
+                f"Install {base_lib} for loading {env_name} data"
+            ) from e
+
     @property
     def observation_space(self):
         """Original observation space of the environment before flatteining (if this is the case)."""
+        if self._observation_space is None:
+            self._load_spaces_from_env()
         return self._observation_space
 
     @property
     def action_space(self):
         """Original action space of the environment before flatteining (if this is the case)."""
+        if self._action_space is None:
+            self._load_spaces_from_env()
         return self._action_space
 
     @property
@@ -304,6 +499,94 @@ class MinariStorage:
         return self._minari_version
 
 
+def _rdcc_nslots(rdcc_nbytes: int) -> int:
+    """Get the number of hash table slots of an HDF5 chunk cache of `rdcc_nbytes` bytes.
+
+    HDF5 recommends a prime number of slots about 10 to 100 times larger than the number of chunks that fit in the cache.
+
+    Args:
+        rdcc_nbytes (int): size in bytes of the chunk cache
+
+    Returns:
+        int: number of slots of the chunk cache
+    """
+    nslots = max(10 * rdcc_nbytes // RDCC_CHUNK_BYTES, 2)
+    while any(nslots % d == 0 for d in range(2, int(nslots**0.5) + 1)):
+        nslots += 1
+    return nslots
+
+
+def _read_arrays(datasets: List[h5py.Dataset]) -> List[np.ndarray]:
+    """Read several HDF5 datasets into NumPy arrays.
+
+    Args:
+        datasets (List[h5py.Dataset]): HDF5 datasets to read
+
+    Returns:
+        List[np.ndarray]: arrays with the content of each dataset
+    """
+    return [dataset[()] for dataset in datasets]
+
+
+def _read_texts(datasets: List[h5py.Dataset]) -> List[List[str]]:
+    """Decode the UTF-8 strings of several HDF5 datasets of a Text space."""
+    return [[string.decode("utf-8") for string in dataset[()]] for dataset in datasets]
+
+
+def _space_reader(
+    space: gym.spaces.Space,
+    read_arrays: SpaceReader = _read_arrays,
+    read_texts: SpaceReader = _read_texts,
+) -> SpaceReader:
+    """Build a function that decodes the HDF5 data of the same space element from several episodes at once.
+
+    The space structure is resolved once when the reader is built, so decoding episodes doesn't need to
+    dispatch on the space types again. Tuple and Dict spaces are decoded component-wise, and the leaves
+    of the space are read with `read_arrays` and `read_texts`, which receive the extra arguments of the reader.
+
+    Args:
+        space (gym.spaces.Space): space of the stored data
+        read_arrays (Callable): function reading the HDF5 datasets of a leaf space. Default to :func:`_read_arrays`.
+        read_texts (Callable): function reading the HDF5 datasets of a Text space. Default to :func:`_read_texts`.
+
+    Returns:
+        Callable: function taking the list of HDF5 groups or datasets of the data and returning the decoded data of each one
+    """
+    if isinstance(space, gym.spaces.Tuple):
+        tuple_readers = [
+            (f"_index_{i}", _space_reader(subspace, read_arrays, read_texts))
+            for i, subspace in enumerate(space.spaces)
+        ]
+
+        def read_tuples(hdf_refs: List[h5py.Group], *args) -> List[Tuple]:
+            components = [
+                read([hdf_ref[key] for hdf_ref in hdf_refs], *args)
+                for key, read in tuple_readers
+            ]
+            return [tuple(values) for values in zip(*components)]
+
+        return read_tuples
+    elif isinstance(space, gym.spaces.Dict):
+        dict_readers = [
+            (key, _space_reader(subspace, read_arrays, read_texts))
+            for key, subspace in space.spaces.items()
+        ]
+
+        def read_dicts(hdf_refs: List[h5py.Group], *args) -> List[Dict]:
+            components = [
+                read([hdf_ref[key] for hdf_ref in hdf_refs], *args)
+                for key, read in dict_readers
+            ]
+            keys = [key for key, _ in dict_readers]
+            return [dict(zip(keys, values)) for values in zip(*components)]
+
+        return read_dicts
+    elif isinstance(space, gym.spaces.Text):
+        return read_texts
+    else:
+        return read_arrays
+
+
 def clear_episode_buffer(episode_buffer: Dict, episode_group: h5py.Group) -> h5py.Group:
     """Save an episode dictionary buffer into an HDF5 episode group recursively.
 
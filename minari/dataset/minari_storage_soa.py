@@ -0,0 +1,512 @@
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import gymnasium as gym
+import h5py
+import numpy as np
+
+from minari.data_collector import DataCollectorV0
+from minari.dataset.minari_storage import (
+    LAYOUT_ATTR,
+    MinariStorage,
+    PathLike,
+    SpaceReader,
+    _space_reader,
+)
+
+
+# Value of the layout attribute of the dataset files in the SoA layout
+SOA_LAYOUT = "soa"
+
+# Seed value stored for the episodes that were collected without a seed
+_NO_SEED = -1
+
+# Target size in bytes of the HDF5 chunks of the SoA datasets (1 MiB)
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+
+# Datasets with the steps data of the episodes, concatenated along the first axis
+_STEP_KEYS = ("observations", "actions", "rewards", "terminations", "truncations")
+
+
+class MinariStorageSoA(MinariStorage):
+    """Minari storage for datasets saved in a structure-of-arrays (SoA) layout.
+
+    Instead of an `episode_{id}` group per episode, each field (`observations`, `actions`, `rewards`, `terminations`
+    and `truncations`) is a single dataset with the steps of all the episodes concatenated along the first axis.
+    The episode boundaries are stored in the `episode_starts` and `episode_lengths` datasets, so that a run of
+    consecutive episodes is read with a single slice per field.
+
+    Datasets in the default per-episode layout can be converted with :meth:`MinariStorageSoA.from_storage`,
+    and :func:`minari.load_dataset` loads the converted datasets with this storage.
+    """
+
+    _layout = SOA_LAYOUT
+
+    def __init__(
+        self,
+        data_path: PathLike,
+        rdcc_nbytes: Optional[int] = None,
+        in_memory: bool = False,
+    ):
+        """Initialize properties of the Minari SoA storage.
+
+        Args:
+            data_path (str): full path to the SoA HDF5 file of the dataset.
+            rdcc_nbytes (Optional[int]): size in bytes of the HDF5 raw data chunk cache of each dataset read. Default to `None`, the h5py default.
+            in_memory (bool): if `True` the whole file is loaded into memory once and kept open for all the reads until :meth:`close` is called. Default to `False`.
+        """
+        super().__init__(data_path, rdcc_nbytes=rdcc_nbytes, in_memory=in_memory)
+        with h5py.File(self._data_path, "r") as f:
+            self._load_episode_index(f)
+
+    @classmethod
+    def from_storage(
+        cls,
+        storage: MinariStorage,
+        data_path: PathLike,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        appendable: bool = False,
+    ) -> "MinariStorageSoA":
+        """Write the episodes of a per-episode Minari storage into a new SoA file.
+
+        The datasets are chunked along the steps axis so that each chunk holds about `chunk_bytes` bytes,
+        which spans several episodes for most environments. Unless `appendable` is set, the chunks are capped
+        to the rows of the converted dataset so that small datasets stay compact. The chunk shape is fixed
+        when the datasets are created, so a capped dataset that is later updated with more episodes keeps
+        its small chunks.
+
+        Args:
+            storage (MinariStorage): source storage in the default per-episode layout
+            data_path (str): full path of the SoA HDF5 file to create
+            chunk_bytes (int): target size in bytes of each HDF5 chunk. Default to 1 MiB.
+            appendable (bool): if `True` don't cap the chunks to the rows of `storage`, for datasets that will be updated with more episodes. Default to `False`.
+
+        Returns:
+            MinariStorageSoA: storage reading the new file
+        """
+        with h5py.File(data_path, "w") as dst:
+            with h5py.File(storage.data_path, "r") as src:
+                for key, value in src.attrs.items():
+                    dst.attrs[key] = value
+            dst.attrs[LAYOUT_ATTR] = SOA_LAYOUT
+
+            total_rows, total_episodes = None, None
+            if not appendable:
+                total_rows = _total_rows(storage.total_steps, storage.total_episodes)
+                total_episodes = storage.total_episodes
+
+            def write_episode(episode: dict) -> Tuple[int, int, int]:
+                return _append_episode(dst, episode, chunk_bytes, total_rows)
+
+            episodes_info = np.array(storage.apply(write_episode), dtype=np.int64)
+            _append_episode_index(
+                dst, episodes_info.reshape(-1, 3), chunk_bytes, total_episodes
+            )
+
+        return cls(data_path, rdcc_nbytes=storage._rdcc_nbytes)
+
+    def _load_episode_index(self, file: h5py.File):
+        """Load the boundaries, ids and seeds of the episodes of the SoA file."""
+        self._episode_starts = file["episode_starts"][()]
+        self._episode_lengths = file["episode_lengths"][()]
+        self._episode_ids = file["episode_ids"][()]
+        self._episode_seeds = file["episode_seeds"][()]
+
+    def _make_space_reader(self, space: gym.spaces.Space) -> SpaceReader:
+        """Build the reader of the `[start:stop]` rows of the data of a space."""
+        return _space_reader(space, _read_slices, _read_text_slices)
+
+    def apply(
+        self,
+        function: Callable[[dict], Any],
+        episode_indices: Optional[Iterable] = None,
+    ) -> List[Any]:
+        """Apply a function to a slice of the data.
+
+        Args:
+            function (Callable): function to apply to episodes
+            episode_indices (Optional[Iterable]): epsiodes id to consider
+
+        Returns:
+            outs (list): list of outputs returned by the function applied to episodes
+        """
+        if episode_indices is None:
+            episode_indices = range(self.total_episodes)
+        episode_indices = self._check_episode_indices(
+            int(ep_idx) for ep_idx in episode_indices
+        )
+
+        with self._read_file() as file:
+            out: List[Any] = [None] * len(episode_indices)
+            for k, ep_idx in enumerate(episode_indices):
+                out[k] = function(self._read_episode_run(file, ep_idx, ep_idx)[0])
+
+        return out
+
+    def get_episodes(self, episode_indices: Iterable[int]) -> List[dict]:
+        """Get a list of episodes.
+
+        Runs of consecutive episode indices are read with a single slice per field, and the arrays of the
+        episodes of a run are views of the same buffer.
+
+        Args:
+            episode_indices (Iterable[int]): episodes id to return
+
+        Returns:
+            episodes (List[dict]): list of episodes data
+        """
+        episode_indices = self._check_episode_indices(
+            int(ep_idx) for ep_idx in episode_indices
+        )
+        runs = _contiguous_runs(episode_indices)
+        with self._read_file() as file:
+            episode_runs = [self._read_episode_run(file, *run) for run in runs]
+
+        return [episode for episode_run in episode_runs for episode in episode_run]
+
+    def _read_episode_run(self, file: h5py.File, first: int, last: int) -> List[dict]:
+        """Read the consecutive episodes from `first` to `last` (both included)."""
+        stop = last + 1
+        lengths = self._episode_lengths[first:stop]
+        step_start = int(self._episode_starts[first])
+        step_stop = int(self._episode_starts[last] + self._episode_lengths[last])
+        # Each episode has one more observation than steps
+        obs_start, obs_stop = step_start + first, step_stop + stop
+        step_splits = np.cumsum(lengths)[:-1]
+        obs_splits = np.cumsum(lengths + 1)[:-1]
+
+        read_observations, read_actions = self._space_readers
+        observations = _split_space_data(
+            read_observations([file["observations"]], obs_start, obs_stop)[0],
+            obs_splits,
+        )
+        actions = _split_space_data(
+            read_actions([file["actions"]], step_start, step_stop)[0], step_splits
+        )
+        rewards, terminations, truncations = (
+            np.split(file[key][step_start:step_stop], step_splits)
+            for key in ("rewards", "terminations", "truncations")
+        )
+
+        out = []
+        for i, ep_idx in enumerate(range(first, stop)):
+            seed = int(self._episode_seeds[ep_idx])
+            out.append(
+                {
+                    "id": int(self._episode_ids[ep_idx]),
+                    "total_timesteps": int(self._episode_lengths[ep_idx]),
+                    # Unseeded episodes read as in the per-episode layout, which stores `str(None)`
+                    "seed": str(None) if seed == _NO_SEED else seed,
+                    "observations": observations[i],
+                    "actions": actions[i],
+                    "rewards": rewards[i],
+                    "terminations": terminations[i],
+                    "truncations": truncations[i],
+                }
+            )
+        return out
+
+    def update_from_collector_env(
+        self,
+        collector_env: DataCollectorV0,
+        new_data_file_path: str,
+        additional_data_id: int,
+    ):
+        """Append the episodes recorded by a collector environment to the dataset.
+
+        The collector environment saves the episodes to `new_data_file_path`, which is removed once they are
+        copied into the SoA datasets.
+        """
+        collector_env.save_to_disk(path=new_data_file_path)
+
+        read_observations = _space_reader(self.observation_space)
+        read_actions = _space_reader(self.action_space)
+        episodes = []
+        with h5py.File(new_data_file_path, "r") as new_data_file:
+            for id in range(new_data_file.attrs["total_episodes"]):
+                ep_group = new_data_file[f"episode_{id}"]
+                episodes.append(
+                    {
+                        "seed": ep_group.attrs.get("seed"),
+                        "observations": read_observations([ep_group["observations"]])[
+                            0
+                        ],
+                        "actions": read_actions([ep_group["actions"]])[0],
+                        "rewards": ep_group["rewards"][()],
+                        "terminations": ep_group["terminations"][()],
+                        "truncations": ep_group["truncations"][()],
+                    }
+                )
+
+        self._append_episodes(episodes, self.data_path)
+        os.remove(new_data_file_path)
+
+    def update_from_buffer(self, buffer: List[dict], data_path: str):
+        """Append the episodes of a list of episode buffers to the dataset.
+
+        Only the `observations`, `actions`, `rewards`, `terminations`, `truncations` and `seed` items of the
+        buffers can be stored in the SoA layout.
+
+        Raises:
+            ValueError: if an episode buffer has other items
+        """
+        episodes = []
+        for eps_buff in buffer:
+            # check episode terminated or truncated
+            assert (
+                eps_buff["terminations"][-1] or eps_buff["truncations"][-1]
+            ), "Each episode must be terminated or truncated before adding it to a Minari dataset"
+            assert len(eps_buff["actions"]) + 1 == len(
+                eps_buff["observations"]
+            ), f"Number of observations {len(eps_buff['observations'])} must have an additional element compared to the number of action steps {len(eps_buff['actions'])}. The initial and final observation must be included"
+            extra_keys = set(eps_buff.keys()) - {*_STEP_KEYS, "seed"}
+            if extra_keys:
+                raise ValueError(
+                    f"The episode items {sorted(extra_keys)} can't be stored in a Minari dataset in the SoA layout."
+                )
+
+            episode = {key: _buffer_to_space_data(eps_buff[key]) for key in _STEP_KEYS}
+            episode["seed"] = eps_buff.get("seed")
+            episodes.append(episode)
+
+        self._append_episodes(episodes, data_path)
+
+    def _append_episodes(self, episodes: List[dict], data_path: PathLike):
+        """Append episodes, nested as returned by :meth:`get_episodes`, to the SoA file and update the storage metadata."""
+        additional_steps = sum(len(episode["rewards"]) for episode in episodes)
+        with self._reopen_after_write(), h5py.File(data_path, "a") as file:
+            last_episode_id = int(file.attrs["total_episodes"])
+            episodes_info = np.empty((len(episodes), 3), dtype=np.int64)
+            for i, episode in enumerate(episodes):
+                episode["id"] = last_episode_id + i
+                episodes_info[i] = _append_episode(file, episode, DEFAULT_CHUNK_BYTES)
+            _append_episode_index(file, episodes_info, DEFAULT_CHUNK_BYTES)
+
+            self._total_steps = int(file.attrs["total_steps"]) + additional_steps
+            self._total_episodes = last_episode_id + len(episodes)
+            file.attrs.modify("total_episodes", self._total_episodes)
+            file.attrs.modify("total_steps", self._total_steps)
+
+            self._load_episode_index(file)
+
+
+def _total_rows(total_steps: int, total_episodes: int) -> Dict[str, int]:
+    """Get the number of rows of each SoA dataset, each episode has one more observation than steps."""
+    total_rows = {key: total_steps for key in _STEP_KEYS}
+    total_rows["observations"] += total_episodes
+    return total_rows
+
+
+def _append_episode(
+    file: h5py.File,
+    episode: dict,
+    chunk_bytes: int,
+    total_rows: Optional[Dict[str, int]] = None,
+) -> Tuple[int, int, int]:
+    """Append the steps data of an episode to the SoA datasets of a file.
+
+    Args:
+        file (h5py.File): SoA HDF5 file
+        episode (dict): episode data, nested as returned by :meth:`MinariStorage.get_episodes`
+        chunk_bytes (int): target size in bytes of the chunks of newly created datasets
+        total_rows (Optional[Dict[str, int]]): number of rows each dataset is going to hold, chunks of newly created datasets are not larger. Default to `None`, no cap.
+
+    Returns:
+        Tuple[int, int, int]: number of steps, id and seed (`_NO_SEED` if the episode wasn't seeded) of the episode
+    """
+    for key in _STEP_KEYS:
+        max_rows = None if total_rows is None else total_rows[key]
+        _append_space_data(file, key, episode[key], chunk_bytes, max_rows)
+    seed = episode["seed"]
+    if not isinstance(seed, (int, np.integer)):
+        seed = _NO_SEED
+    return len(episode["rewards"]), episode["id"], seed
+
+
+def _append_episode_index(
+    file: h5py.File,
+    episodes_info: np.ndarray,
+    chunk_bytes: int,
+    max_rows: Optional[int] = None,
+):
+    """Append the boundaries, ids and seeds of new episodes to the episode index datasets of an SoA file.
+
+    Args:
+        file (h5py.File): SoA HDF5 file
+        episodes_info (np.ndarray): `(n_episodes, 3)` array with the number of steps, id and seed of each new episode
+        chunk_bytes (int): target size in bytes of the chunks of newly created datasets
+        max_rows (Optional[int]): number of episodes the index is going to hold, chunks of newly created datasets are not larger. Default to `None`, no cap.
+    """
+    episode_lengths = episodes_info[:, 0]
+    episode_starts = np.zeros_like(episode_lengths)
+    episode_starts[1:] = np.cumsum(episode_lengths)[:-1]
+    if "episode_starts" in file and len(file["episode_starts"]) > 0:
+        episode_starts += file["episode_starts"][-1] + file["episode_lengths"][-1]
+
+    for key, data in (
+        ("episode_starts", episode_starts),
+        ("episode_lengths", episode_lengths),
+        ("episode_ids", episodes_info[:, 1]),
+        ("episode_seeds", episodes_info[:, 2]),
+    ):
+        if key not in file:
+            chunk_rows = max(chunk_bytes // data.itemsize, 1)
+            if max_rows is not None:
+                chunk_rows = min(chunk_rows, max(max_rows, 1))
+            file.create_dataset(
+                key,
+                shape=(0,),
+                maxshape=(None,),
+                dtype=np.int64,
+                chunks=(chunk_rows,),
+            )
+        dataset = file[key]
+        n_rows = dataset.shape[0]
+        dataset.resize(n_rows + len(data), axis=0)
+        dataset[n_rows:] = data
+
+
+def _contiguous_runs(episode_indices: List[int]) -> List[Tuple[int, int]]:
+    """Group episode indices into runs of consecutive increasing indices, preserving their order.
+
+    Args:
+        episode_indices (List[int]): episode indices
+
+    Returns:
+        List[Tuple[int, int]]: first and last (included) index of each run
+    """
+    runs = []
+    for ep_idx in episode_indices:
+        if runs and ep_idx == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], ep_idx)
+        else:
+            runs.append((ep_idx, ep_idx))
+    return runs
+
+
+def _read_slices(
+    datasets: List[h5py.Dataset], start: int, stop: int
+) -> List[np.ndarray]:
+    """Read the `[start:stop]` slice of several HDF5 datasets."""
+    return [dataset[start:stop] for dataset in datasets]
+
+
+def _read_text_slices(
+    datasets: List[h5py.Dataset], start: int, stop: int
+) -> List[List[str]]:
+    """Decode the UTF-8 strings of the `[start:stop]` slice of several HDF5 datasets of a Text space."""
+    return [
+        [string.decode("utf-8") for string in dataset[start:stop]]
+        for dataset in datasets
+    ]
+
+
+def _split_space_data(
+    data: Union[Dict, Tuple, List, np.ndarray], splits: np.ndarray
+) -> List[Union[Dict, Tuple, List, np.ndarray]]:
+    """Split the data of a space element along the first axis into one entry per episode.
+
+    Args:
+        data (Union[Dict, Tuple, List, np.ndarray]): concatenated data of several episodes
+        splits (np.ndarray): indices where each episode after the first one starts
+
+    Returns:
+        List: data of each episode
+    """
+    if isinstance(data, tuple):
+        components = [_split_space_data(value, splits) for value in data]
+        return [tuple(values) for values in zip(*components)]
+    elif isinstance(data, dict):
+        keys = list(data.keys())
+        components = [_split_space_data(data[key], splits) for key in keys]
+        return [dict(zip(keys, values)) for values in zip(*components)]
+    elif isinstance(data, list):
+        bounds = [0, *splits.tolist(), len(data)]
+        return [data[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    else:
+        return np.split(data, splits)
+
+
+def _buffer_to_space_data(data: Any) -> Union[Dict, Tuple, List, np.ndarray]:
+    """Convert an item of an episode buffer into the nested format returned by :meth:`MinariStorage.get_episodes`.
+
+    The items are laid out as accepted by :func:`minari.dataset.minari_storage.clear_episode_buffer`,
+    e.g. a list with a tuple or a dictionary per step.
+
+    Args:
+        data (Any): item of the episode buffer
+
+    Returns:
+        Union[Dict, Tuple, List, np.ndarray]: tuples and dictionaries of the stacked data of the steps
+    """
+    if isinstance(data, dict):
+        return {key: _buffer_to_space_data(value) for key, value in data.items()}
+    elif isinstance(data, np.ndarray) or len(data) == 0:
+        return np.asarray(data)
+    elif all(isinstance(entry, tuple) for entry in data):
+        return tuple(
+            _buffer_to_space_data([entry[i] for entry in data])
+            for i in range(len(data[0]))
+        )
+    elif all(isinstance(entry, dict) for entry in data):
+        return {
+            key: _buffer_to_space_data([entry[key] for entry in data])
+            for key in data[0].keys()
+        }
+    elif all(isinstance(entry, str) for entry in data):
+        return list(data)
+    else:
+        return np.asarray(data)
+
+
+def _append_space_data(
+    group: h5py.Group,
+    key: str,
+    data: Union[Dict, Tuple, List, np.ndarray],
+    chunk_bytes: int,
+    max_rows: Optional[int] = None,
+):
+    """Append the data of an episode to the resizable datasets of an SoA file, creating them if needed.
+
+    Args:
+        group (h5py.Group): HDF5 group holding the datasets
+        key (str): name of the dataset or group of the data
+        data (Union[Dict, Tuple, List, np.ndarray]): episode data, nested as returned by :meth:`MinariStorage.get_episodes`
+        chunk_bytes (int): target size in bytes of the chunks of newly created datasets
+        max_rows (Optional[int]): number of rows the datasets are going to hold, chunks of newly created datasets are not larger. Default to `None`, no cap.
+    """
+    if isinstance(data, tuple):
+        subgroup = group.require_group(key)
+        for i, value in enumerate(data):
+            _append_space_data(subgroup, f"_index_{i}", value, chunk_bytes, max_rows)
+        return
+    elif isinstance(data, dict):
+        subgroup = group.require_group(key)
+        for subkey, value in data.items():
+            _append_space_data(subgroup, subkey, value, chunk_bytes, max_rows)
+        return
+
+    if isinstance(data, list):
+        dtype = h5py.string_dtype(encoding="utf-8")
+        data = np.array(data, dtype=object)
+    else:
+        dtype = data.dtype
+
+    if key not in group:
+        row_shape = data.shape[1:]
+        row_bytes = max(int(np.prod(row_shape, dtype=np.int64)), 1) * data.itemsize
+        chunk_rows = max(chunk_bytes // row_bytes, 1)
+        if max_rows is not None:
+            chunk_rows = min(chunk_rows, max(max_rows, 1))
+        group.create_dataset(
+            key,
+            shape=(0, *row_shape),
+            maxshape=(None, *row_shape),
+            dtype=dtype,
+            chunks=(chunk_rows, *row_shape),
+        )
+    dataset = group[key]
+    n_rows = dataset.shape[0]
+    if len(data) > 0:
+        dataset.resize(n_rows + len(data), axis=0)
+        dataset[n_rows:] = data
@@ -1,12 +1,17 @@
 import importlib.metadata
 import os
 import shutil
-from typing import Dict, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import h5py
 from packaging.specifiers import SpecifierSet
 
-from minari.dataset.minari_dataset import MinariDataset, parse_dataset_id
+from minari.dataset.minari_dataset import (
+    MinariDataset,
+    load_storage,
+    parse_dataset_id,
+)
 from minari.storage import hosting
 from minari.storage.datasets_root_dir import get_dataset_path
 
@@ -14,13 +19,65 @@ from minari.storage.datasets_root_dir import get_dataset_path
 # Use importlib due to circular import when: "from minari import __version__"
 __version__ = importlib.metadata.version("minari")
 
+# Metadata of the local datasets read by `list_local_datasets`, keyed by the path of their
+# `main_data.hdf5` file. Each entry holds the file modification time and size, its `minari_version`
+# attribute (`None` if the file is not a Minari dataset) and its attributes (`None` if not read yet).
+# Entries are only reused while the file modification time and size match.
+_metadata_cache: Dict[
+    str, Tuple[Tuple[int, int], Optional[str], Optional[Dict[str, Any]]]
+] = {}
 
-def load_dataset(dataset_id: str, download: bool = False):
+
+def _read_dataset_metadata(
+    main_file_path: str, compatible_minari_version: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Read the attributes of a dataset main HDF5 file, reusing the cached values if the file has not changed.
+
+    The `minari_version` attribute is checked first and the rest of the attributes are only read for the
+    datasets that are going to be listed.
+
+    Args:
+        main_file_path (str): path to the `main_data.hdf5` file of the dataset
+        compatible_minari_version (bool): if `True` skip the dataset if it's not compatible with the current Minari version
+
+    Returns:
+        Optional[Dict[str, Any]]: the attributes of the file, `None` if the dataset is skipped
+    """
+
+    def is_listed(minari_version: Optional[str]) -> bool:
+        return minari_version is not None and (
+            not compatible_minari_version or __version__ in SpecifierSet(minari_version)
+        )
+
+    stat = os.stat(main_file_path)
+    file_key = (stat.st_mtime_ns, stat.st_size)
+    cached = _metadata_cache.get(main_file_path)
+    if cached is not None and cached[0] == file_key:
+        _, minari_version, metadata = cached
+        if not is_listed(minari_version):
+            return None
+    else:
+        minari_version, metadata = None, None
+
+    if metadata is None:
+        with h5py.File(main_file_path, "r") as f:
+            minari_version = f.attrs.get("minari_version")
+            if is_listed(minari_version):
+                metadata = dict(f.attrs.items())
+        _metadata_cache[main_file_path] = (file_key, minari_version, metadata)
+
+    return None if metadata is None else dict(metadata)
+
+
+def load_dataset(dataset_id: str, download: bool = False, in_memory: bool = False):
     """Retrieve Minari dataset from local database.
 
+    The memory of a dataset loaded with `in_memory=True` is held until the dataset is closed with :meth:`minari.MinariDataset.close`.
+
     Args:
         dataset_id (str): name id of Minari dataset
         download (bool): if `True` download the dataset if it is not found locally. Default to `False`.
+        in_memory (bool): if `True` the dataset file is loaded into memory once and all the following reads are served from memory. Only use it for datasets that fit in RAM. Default to `False`.
 
     Returns:
         MinariDataset
@@ -36,7 +93,32 @@ def load_dataset(dataset_id: str, download: bool = False):
 
         hosting.download_dataset(dataset_id)
 
-    return MinariDataset(data_path)
+    return MinariDataset(load_storage(data_path, in_memory=in_memory))
+
+
+def list_local_dataset_ids() -> List[str]:
+    """Get the names of the directories of the local database that contain a `data` directory.
+
+    Unlike :func:`list_local_datasets`, the dataset files are not opened, so the returned ids are not
+    checked to be valid Minari datasets. Hidden entries and files are skipped.
+
+    Returns:
+       List[str]: sorted names of the local dataset directories
+    """
+    datasets_path = get_dataset_path("")
+    with os.scandir(datasets_path) as entries:
+        dataset_ids = sorted(
+            entry.name
+            for entry in entries
+            if not entry.name.startswith(".") and entry.is_dir()
+        )
+
+    # Minari datasets must contain the data directory.
+    return [
+        dst_id
+        for dst_id in dataset_ids
+        if os.path.isdir(os.path.join(datasets_path, dst_id, "data"))
+    ]
 
 
 def list_local_datasets(
@@ -53,38 +135,28 @@ def list_local_datasets(
        Dict[str, Dict[str, str]]: keys the names of the Minari datasets and values the metadata
     """
     datasets_path = get_dataset_path("")
-    dataset_ids = sorted(
-        [
-            dir_name
-            for dir_name in os.listdir(datasets_path)
-            if not dir_name.startswith(".")
-        ]
-    )
+
+    dataset_ids = list_local_dataset_ids()
+
+    def read_metadata(dst_id: str) -> Optional[Dict[str, Any]]:
+        main_file_path = os.path.join(datasets_path, dst_id, "data", "main_data.hdf5")
+        return _read_dataset_metadata(main_file_path, compatible_minari_version)
+
+    # Opening the files is dominated by I/O latency, read them concurrently
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        datasets_metadata = list(executor.map(read_metadata, dataset_ids))
 
     local_datasets = {}
-    for dst_id in dataset_ids:
-        if "data" not in os.listdir(os.path.join(datasets_path, dst_id)):
-            # Minari datasets must contain the data directory.
+    for dst_id, metadata in zip(dataset_ids, datasets_metadata):
+        if metadata is None:
             continue
-
-        main_file_path = os.path.join(datasets_path, dst_id, "data/main_data.hdf5")
-        with h5py.File(main_file_path, "r") as f:
-            metadata = dict(f.attrs.items())
-            if ("minari_version" not in metadata) or (
-                compatible_minari_version
-                and __version__ not in SpecifierSet(metadata["minari_version"])
-            ):
-                continue
-            env_name, dataset_name, version = parse_dataset_id(dst_id)
-            dataset = f"{env_name}-{dataset_name}"
-            if latest_version:
-                if (
-                    dataset not in local_datasets
-                    or version > local_datasets[dataset][0]
-                ):
-                    local_datasets[dataset] = (version, metadata)
-            else:
-                local_datasets[dst_id] = metadata
+        env_name, dataset_name, version = parse_dataset_id(dst_id)
+        dataset = f"{env_name}-{dataset_name}"
+        if latest_version:
+            if dataset not in local_datasets or version > local_datasets[dataset][0]:
+                local_datasets[dataset] = (version, metadata)
+        else:
+            local_datasets[dst_id] = metadata
     if latest_version:
         # Return dict = {'dataset_id': metadata}
         return dict(
@@ -101,5 +173,6 @@ def delete_dataset(dataset_id: str):
         dataset_id (str): name id of the Minari dataset
     """
     dataset_path = get_dataset_path(dataset_id)
+    _metadata_cache.pop(os.path.join(dataset_path, "data", "main_data.hdf5"), None)
     shutil.rmtree(dataset_path)
     print(f"Dataset {dataset_id} deleted!")
@@ -18,7 +18,11 @@ from packaging.version import Version
 
 from minari import DataCollectorV0
 from minari.dataset.minari_dataset import MinariDataset
-from minari.dataset.minari_storage import clear_episode_buffer
+from minari.dataset.minari_storage import (
+    EPISODES_LAYOUT,
+    LAYOUT_ATTR,
+    clear_episode_buffer,
+)
 from minari.serialization import serialize_space
 from minari.storage.datasets_root_dir import get_dataset_path
 
@@ -218,9 +222,21 @@ def combine_datasets(
 
     Returns:
         combined_dataset (MinariDataset): the resulting MinariDataset
+
+    Raises:
+        ValueError: if any of the datasets is not stored in the default per-episode layout
     """
     combined_dataset_env_spec = validate_datasets_to_combine(datasets_to_combine)
 
+    # The episodes are copied or linked as `episode_{id}` groups, which only the per-episode layout has
+    for dataset in datasets_to_combine:
+        with h5py.File(dataset.spec.data_path, "r") as dataset_file:
+            layout = dataset_file.attrs.get(LAYOUT_ATTR, EPISODES_LAYOUT)
+        if layout != EPISODES_LAYOUT:
+            raise ValueError(
+                f"Dataset {dataset.spec.dataset_id} is stored in the '{layout}' layout, only datasets in the '{EPISODES_LAYOUT}' layout can be combined."
+            )
+
     # Compute intersection of Minari version specifiers
     datasets_minari_version_specifiers = SpecifierSet()
     for dataset in datasets_to_combine:
@@ -1,6 +1,6 @@
 import sys
 import unicodedata
-from typing import Any, Iterable, List, Union
+from typing import Any, Iterable, List, Sequence, Union
 
 import gymnasium as gym
 import numpy as np
@@ -525,6 +525,37 @@ def _check_space_elem(data: Any, space: spaces.Space, n_elements: int):
         assert len(data) == n_elements
 
 
+def sample_actions(action_space: spaces.Space, n_steps: int) -> Sequence[Any]:
+    """Sample the random actions of a whole episode at once.
+
+    Bounded float `Box` and `Discrete` spaces are sampled with a single vectorized call to the space random
+    generator, other spaces fall back to calling `action_space.sample()` for each step.
+
+    Args:
+        action_space (gym.spaces.Space): action space to sample from
+        n_steps (int): number of actions to sample, i.e. the maximum number of steps of the episode
+
+    Returns:
+        Sequence: the sampled actions
+    """
+    if (
+        isinstance(action_space, spaces.Box)
+        and action_space.dtype.kind == "f"
+        and action_space.is_bounded()
+    ):
+        return action_space.np_random.uniform(
+            low=action_space.low,
+            high=action_space.high,
+            size=(n_steps, *action_space.shape),
+        ).astype(action_space.dtype)
+    elif isinstance(action_space, spaces.Discrete):
+        return action_space.start + action_space.np_random.integers(
+            action_space.n, size=n_steps
+        )
+    else:
+        return [action_space.sample() for _ in range(n_steps)]
+
+
 def check_load_and_delete_dataset(dataset_id: str):
     """Test loading and deletion of local Minari datasets.
 
@@ -549,7 +580,7 @@ def check_load_and_delete_dataset(dataset_id: str):
 def create_dummy_dataset_with_collecter_env_helper(
     dataset_id: str, env: DataCollectorV0, num_episodes: int = 10
 ):
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -559,8 +590,11 @@ def create_dummy_dataset_with_collecter_env_helper(
     for episode in range(num_episodes):
         terminated = False
         truncated = False
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             _, _, terminated, truncated, _ = env.step(action)
             if terminated or truncated:
                 assert not env._buffer[-1]
@@ -10,6 +10,7 @@ from tests.common import (
     check_env_recovery_with_subset_spaces,
     check_load_and_delete_dataset,
     register_dummy_envs,
+    sample_actions,
 )
 
 
@@ -41,7 +42,7 @@ def test_data_collector_step_data_callback():
     """Test DataCollectorV0 wrapper and Minari dataset creation."""
     dataset_id = "dummy-dict-test-v0"
     # delete the test dataset if it already exists
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -80,8 +81,11 @@ def test_data_collector_step_data_callback():
     for episode in range(num_episodes):
         terminated = False
         truncated = False
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             _, _, terminated, truncated, _ = env.step(action)
 
         env.reset()
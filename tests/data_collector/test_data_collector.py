@@ -4,7 +4,11 @@ import pytest
 
 import minari
 from minari import DataCollectorV0, EpisodeData, MinariDataset, StepDataCallback
-from tests.common import check_load_and_delete_dataset, register_dummy_envs
+from tests.common import (
+    check_load_and_delete_dataset,
+    register_dummy_envs,
+    sample_actions,
+)
 
 
 register_dummy_envs()
@@ -106,8 +110,8 @@ def test_truncation_without_reset(dataset_id, env_id):
 
     env.reset()
 
-    for _ in range(num_steps):
-        env.step(env.action_space.sample())
+    for action in sample_actions(env.action_space, num_steps):
+        env.step(action)
 
     dataset = minari.create_dataset_from_collector_env(
         dataset_id=dataset_id,
@@ -1,4 +1,3 @@
-import copy
 import re
 from typing import Any
 
@@ -16,21 +15,24 @@ from tests.common import (
     check_load_and_delete_dataset,
     create_dummy_dataset_with_collecter_env_helper,
     register_dummy_envs,
+    sample_actions,
     test_spaces,
 )
 
 
 register_dummy_envs()
 
+rng = np.random.default_rng()
+
 
 @pytest.mark.parametrize("space", test_spaces)
 def test_episode_data(space: gym.Space):
-    id = np.random.randint(1024)
-    seed = np.random.randint(1024)
+    id = rng.integers(1024)
+    seed = rng.integers(1024)
     total_timestep = 100
-    rewards = np.random.randn(total_timestep)
-    terminations = np.random.choice([True, False], size=(total_timestep,))
-    truncations = np.random.choice([True, False], size=(total_timestep,))
+    rewards = rng.standard_normal(total_timestep)
+    terminations = rng.random(total_timestep) < 0.5
+    truncations = rng.random(total_timestep) < 0.5
     episode_data = EpisodeData(
         id=id,
         seed=seed,
@@ -68,7 +70,7 @@ def test_episode_data(space: gym.Space):
 )
 def test_update_dataset_from_collector_env(dataset_id, env_id):
 
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -87,8 +89,11 @@ def test_update_dataset_from_collector_env(dataset_id, env_id):
     for episode in range(num_episodes):
         terminated = False
         truncated = False
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             _, _, terminated, truncated, _ = env.step(action)
             if terminated or truncated:
                 assert not env._buffer[-1]
@@ -127,7 +132,7 @@ def test_filter_episodes_and_subsequent_updates(dataset_id, env_id):
 
     Additionally ensures indices are correctly updated when adding more episodes to a filtered dataset.
     """
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -161,8 +166,11 @@ def test_filter_episodes_and_subsequent_updates(dataset_id, env_id):
     for episode in range(num_episodes):
         terminated = False
         truncated = False
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             _, _, terminated, truncated, _ = env.step(action)
             if terminated or truncated:
                 assert not env._buffer[-1]
@@ -222,8 +230,11 @@ def test_filter_episodes_and_subsequent_updates(dataset_id, env_id):
         terminated = False
         truncated = False
 
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             observation, reward, terminated, truncated, _ = env.step(action)
             observations.append(observation)
             actions.append(action)
@@ -232,8 +243,8 @@ def test_filter_episodes_and_subsequent_updates(dataset_id, env_id):
             truncations.append(truncated)
 
         episode_buffer = {
-            "observations": copy.deepcopy(observations),
-            "actions": copy.deepcopy(actions),
+            "observations": list(observations),
+            "actions": list(actions),
             "rewards": np.asarray(rewards),
             "terminations": np.asarray(terminations),
             "truncations": np.asarray(truncations),
@@ -305,7 +316,7 @@ def test_filter_episodes_and_subsequent_updates(dataset_id, env_id):
     ],
 )
 def test_sample_episodes(dataset_id, env_id):
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -322,16 +333,17 @@ def test_sample_episodes(dataset_id, env_id):
         return int(episode.id) >= 3
 
     filtered_dataset = dataset.filter_episodes(filter_by_index)
-    for i in [1, 7]:
-        episodes = list(filtered_dataset.sample_episodes(i))
-        assert len(episodes) == i
-        check_episode_data_integrity(
-            episodes,
-            filtered_dataset.spec.observation_space,
-            filtered_dataset.spec.action_space,
-        )
-    with pytest.raises(ValueError):
-        episodes = filtered_dataset.sample_episodes(8)
+    with filtered_dataset:
+        for i in [1, 7]:
+            episodes = list(filtered_dataset.sample_episodes(i))
+            assert len(episodes) == i
+            check_episode_data_integrity(
+                episodes,
+                filtered_dataset.spec.observation_space,
+                filtered_dataset.spec.action_space,
+            )
+        with pytest.raises(ValueError):
+            episodes = filtered_dataset.sample_episodes(8)
 
     env.close()
 
@@ -348,7 +360,7 @@ def test_sample_episodes(dataset_id, env_id):
     ],
 )
 def test_iterate_episodes(dataset_id, env_id):
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -398,7 +410,7 @@ def test_iterate_episodes(dataset_id, env_id):
 )
 def test_update_dataset_from_buffer(dataset_id, env_id):
 
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -429,8 +441,11 @@ def test_update_dataset_from_buffer(dataset_id, env_id):
         terminated = False
         truncated = False
 
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             observation, reward, terminated, truncated, _ = env.step(action)
             observations.append(observation)
             actions.append(action)
@@ -439,8 +454,8 @@ def test_update_dataset_from_buffer(dataset_id, env_id):
             truncations.append(truncated)
 
         episode_buffer = {
-            "observations": copy.deepcopy(observations),
-            "actions": copy.deepcopy(actions),
+            "observations": list(observations),
+            "actions": list(actions),
             "rewards": np.asarray(rewards),
             "terminations": np.asarray(terminations),
             "truncations": np.asarray(truncations),
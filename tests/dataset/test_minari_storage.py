@@ -1,10 +1,23 @@
 import os
 
+import gymnasium as gym
 import h5py
+import numpy as np
 import pytest
+from gymnasium.utils.env_checker import data_equivalence
 
-from minari import __version__
-from minari.dataset.minari_storage import MinariStorage
+import minari
+from minari import DataCollectorV0, MinariDataset, __version__
+from minari.dataset.minari_storage import MinariStorage, _rdcc_nslots
+from minari.dataset.minari_storage_soa import MinariStorageSoA
+from tests.common import (
+    check_data_integrity,
+    create_dummy_dataset_with_collecter_env_helper,
+    register_dummy_envs,
+)
+
+
+register_dummy_envs()
 
 
 file_path = os.path.join(os.path.expanduser("~"), ".minari", "datasets")
@@ -33,9 +46,292 @@ def test_minari_storage_missing_env_module():
 
     _create_dummy_dataset(file_path)
 
+    # The environment is only instantiated when the spaces are first accessed
+    storage = MinariStorage(os.path.join(file_path, "dummy-test-v0.hdf5"))
+    assert storage.total_episodes == 100
+
+    with pytest.raises(
+        ModuleNotFoundError, match="Install dummymodule for loading DummyEnv-v0 data"
+    ):
+        storage.observation_space
+
+    dataset = MinariDataset(os.path.join(file_path, "dummy-test-v0.hdf5"))
+    assert dataset.spec.total_episodes == 100
     with pytest.raises(
         ModuleNotFoundError, match="Install dummymodule for loading DummyEnv-v0 data"
     ):
-        MinariStorage(os.path.join(file_path, "dummy-test-v0.hdf5"))
+        dataset.spec.action_space
 
     os.remove(os.path.join(file_path, "dummy-test-v0.hdf5"))
+
+
+@pytest.mark.parametrize(
+    "rdcc_nbytes", [0, 1024 * 1024, 128 * 1024 * 1024, 512 * 1024 * 1024]
+)
+def test_rdcc_nslots(rdcc_nbytes):
+    nslots = _rdcc_nslots(rdcc_nbytes)
+    assert nslots >= 2
+    assert all(nslots % d != 0 for d in range(2, int(nslots**0.5) + 1))
+    assert _rdcc_nslots(2 * rdcc_nbytes) >= nslots
+
+
+@pytest.mark.parametrize(
+    "dataset_id,env_id",
+    [
+        ("cartpole-test-v0", "CartPole-v1"),
+        ("dummy-dict-test-v0", "DummyDictEnv-v0"),
+        ("dummy-tuple-test-v0", "DummyTupleEnv-v0"),
+        ("dummy-text-test-v0", "DummyTextEnv-v0"),
+        ("dummy-combo-test-v0", "DummyComboEnv-v0"),
+    ],
+)
+def test_minari_storage_soa(dataset_id, env_id):
+    env = DataCollectorV0(gym.make(env_id))
+    dataset = create_dummy_dataset_with_collecter_env_helper(
+        dataset_id, env, num_episodes=10
+    )
+    storage = dataset._data
+
+    soa_path = os.path.join(os.path.dirname(storage.data_path), "soa_data.hdf5")
+    soa_storage = MinariStorageSoA.from_storage(storage, soa_path, chunk_bytes=1024)
+    assert soa_storage.total_episodes == storage.total_episodes
+    assert soa_storage.total_steps == storage.total_steps
+
+    episode_indices = [7, 2, 3, 4, 0, 9]
+    episodes = storage.get_episodes(episode_indices)
+    soa_episodes = soa_storage.get_episodes(episode_indices)
+    for episode, soa_episode in zip(episodes, soa_episodes):
+        for key in ("id", "total_timesteps", "seed"):
+            assert episode[key] == soa_episode[key]
+        for key in (
+            "observations",
+            "actions",
+            "rewards",
+            "terminations",
+            "truncations",
+        ):
+            assert data_equivalence(episode[key], soa_episode[key])
+
+    total_steps = soa_storage.apply(lambda episode: episode["total_timesteps"])
+    assert sum(total_steps) == storage.total_steps
+
+    soa_dataset = MinariDataset(soa_storage)
+    check_data_integrity(soa_storage, soa_dataset.episode_indices)
+
+    # Chunks are capped to the size of the datasets, which are smaller than the default chunk size
+    soa_storage = MinariStorageSoA.from_storage(storage, soa_path)
+    chunk_shapes = []
+    with h5py.File(soa_path, "r") as f:
+        f.visititems(
+            lambda _, obj: chunk_shapes.append((obj.chunks, obj.shape))
+            if isinstance(obj, h5py.Dataset) and obj.chunks is not None
+            else None
+        )
+    assert len(chunk_shapes) > 0
+    for chunks, shape in chunk_shapes:
+        assert chunks[0] <= shape[0]
+    assert os.path.getsize(soa_path) < 2 * os.path.getsize(storage.data_path)
+
+    # Appendable datasets keep the default chunk size for the episodes added later
+    MinariStorageSoA.from_storage(storage, soa_path, appendable=True)
+    with h5py.File(soa_path, "r") as f:
+        assert f["rewards"].chunks[0] > f["rewards"].shape[0]
+        assert f["episode_starts"].chunks[0] > f["episode_starts"].shape[0]
+
+    # The storages only read files in their own layout
+    with pytest.raises(ValueError, match="soa layout"):
+        MinariStorage(soa_path)
+    with pytest.raises(ValueError, match="episodes layout"):
+        MinariStorageSoA(storage.data_path)
+    assert isinstance(MinariDataset(soa_path)._data, MinariStorageSoA)
+
+    minari.delete_dataset(dataset_id)
+
+
+@pytest.mark.parametrize(
+    "dataset_id,env_id",
+    [
+        ("cartpole-test-v0", "CartPole-v1"),
+        ("dummy-dict-test-v0", "DummyDictEnv-v0"),
+        ("dummy-tuple-test-v0", "DummyTupleEnv-v0"),
+        ("dummy-text-test-v0", "DummyTextEnv-v0"),
+        ("dummy-combo-test-v0", "DummyComboEnv-v0"),
+    ],
+)
+def test_minari_storage_soa_update(dataset_id, env_id):
+    env = DataCollectorV0(gym.make(env_id))
+    dataset = create_dummy_dataset_with_collecter_env_helper(
+        dataset_id, env, num_episodes=10
+    )
+    storage = dataset._data
+    episodes = storage.get_episodes(range(storage.total_episodes))
+
+    # Replace the dataset file with its SoA version, which load_dataset picks up
+    soa_path = os.path.join(os.path.dirname(storage.data_path), "soa_data.hdf5")
+    MinariStorageSoA.from_storage(storage, soa_path)
+    os.replace(soa_path, storage.data_path)
+    soa_dataset = minari.load_dataset(dataset_id)
+    assert isinstance(soa_dataset._data, MinariStorageSoA)
+
+    buffer_env = gym.make(env_id)
+    buffer = []
+    for seed in (None, 7, None):
+        observation, _ = buffer_env.reset(seed=seed)
+        episode_buffer = {
+            "observations": [observation],
+            "actions": [],
+            "rewards": [],
+            "terminations": [],
+            "truncations": [],
+            "seed": seed,
+        }
+        terminated, truncated = False, False
+        while not terminated and not truncated:
+            action = buffer_env.action_space.sample()
+            observation, reward, terminated, truncated, _ = buffer_env.step(action)
+            episode_buffer["observations"].append(observation)
+            episode_buffer["actions"].append(action)
+            episode_buffer["rewards"].append(reward)
+            episode_buffer["terminations"].append(terminated)
+            episode_buffer["truncations"].append(truncated)
+        buffer.append(episode_buffer)
+    with pytest.raises(ValueError, match="can't be stored"):
+        soa_dataset.update_dataset_from_buffer(
+            [{**buffer[0], "infos": [{}] * len(buffer[0]["actions"])}]
+        )
+    soa_dataset.update_dataset_from_buffer(buffer)
+    assert soa_dataset.total_episodes == 13
+    assert soa_dataset.spec.total_steps == storage.total_steps + sum(
+        len(episode_buffer["actions"]) for episode_buffer in buffer
+    )
+
+    for _ in range(2):
+        env.reset()
+        terminated, truncated = False, False
+        while not terminated and not truncated:
+            _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+    soa_dataset.update_dataset_from_collector_env(env)
+    assert soa_dataset.total_episodes == 15
+
+    soa_storage = soa_dataset._data
+    check_data_integrity(soa_storage, soa_dataset.episode_indices)
+    for episode, soa_episode in zip(episodes, soa_storage.get_episodes(range(10))):
+        assert episode["seed"] == soa_episode["seed"]
+        assert data_equivalence(episode["observations"], soa_episode["observations"])
+    new_episodes = soa_storage.get_episodes(range(10, 13))
+    for episode_buffer, new_episode in zip(buffer, new_episodes):
+        seed = episode_buffer["seed"]
+        assert new_episode["seed"] == (str(None) if seed is None else seed)
+        assert data_equivalence(
+            np.asarray(episode_buffer["rewards"]), new_episode["rewards"]
+        )
+    assert [episode["id"] for episode in soa_storage.get_episodes(range(15))] == list(
+        range(15)
+    )
+
+    reloaded_dataset = minari.load_dataset(dataset_id)
+    assert reloaded_dataset.total_episodes == 15
+    assert reloaded_dataset.total_steps == soa_dataset.spec.total_steps
+
+    env.close()
+    minari.delete_dataset(dataset_id)
+
+
+def test_minari_storage_nested_context():
+    dataset_id = "cartpole-test-v0"
+    env = DataCollectorV0(gym.make("CartPole-v1"))
+    dataset = create_dummy_dataset_with_collecter_env_helper(
+        dataset_id, env, num_episodes=10
+    )
+    storage = dataset._data
+
+    with storage:
+        file = storage._file
+        with storage:
+            assert storage._file is file
+        assert storage._file is file
+        assert len(storage.get_episodes([0, 1])) == 2
+        assert set(storage._ep_groups) == {0, 1}
+    assert storage._file is None
+    assert storage._ep_groups == {}
+
+    # The dataset context delegates to the one of its storage
+    with dataset:
+        file = storage._file
+        assert file is not None
+        with storage:
+            assert storage._file is file
+        assert storage._file is file
+    assert storage._file is None
+
+    for ep_idx in (-1, storage.total_episodes):
+        with pytest.raises(KeyError):
+            storage.get_episodes([ep_idx])
+        with storage, pytest.raises(KeyError):
+            storage.get_episodes([ep_idx])
+
+    minari.delete_dataset(dataset_id)
+
+
+def test_minari_storage_env_spec_not_shared():
+    dataset_id = "cartpole-test-v0"
+    env = DataCollectorV0(gym.make("CartPole-v1"))
+    create_dummy_dataset_with_collecter_env_helper(dataset_id, env, num_episodes=10)
+
+    dataset = minari.load_dataset(dataset_id)
+    other_dataset = minari.load_dataset(dataset_id)
+    assert dataset.spec.env_spec is not other_dataset.spec.env_spec
+    assert dataset.spec.env_spec == other_dataset.spec.env_spec
+
+    max_episode_steps = dataset.spec.env_spec.max_episode_steps
+    dataset.spec.env_spec.max_episode_steps = 7
+    dataset.spec.env_spec.kwargs["render_mode"] = "rgb_array"
+    reloaded_dataset = minari.load_dataset(dataset_id)
+    assert reloaded_dataset.spec.env_spec.max_episode_steps == max_episode_steps
+    assert "render_mode" not in reloaded_dataset.spec.env_spec.kwargs
+
+    minari.delete_dataset(dataset_id)
+
+
+def test_load_dataset_in_memory():
+    dataset_id = "cartpole-test-v0"
+    env = DataCollectorV0(gym.make("CartPole-v1"))
+    create_dummy_dataset_with_collecter_env_helper(dataset_id, env, num_episodes=10)
+
+    dataset = minari.load_dataset(dataset_id, in_memory=True)
+    storage = dataset._data
+    assert storage._file is not None
+    assert storage._file.driver == "core"
+
+    check_data_integrity(storage, dataset.episode_indices)
+    with dataset:
+        assert len(dataset.sample_episodes(5)) == 5
+    assert storage._file is not None
+
+    # The in-memory dataset doesn't lock the file against other writers
+    other_dataset = minari.load_dataset(dataset_id)
+    buffer = [
+        {
+            key: episode[key]
+            for key in (
+                "observations",
+                "actions",
+                "rewards",
+                "terminations",
+                "truncations",
+            )
+        }
+        for episode in other_dataset._data.get_episodes([0, 1])
+    ]
+    other_dataset.update_dataset_from_buffer(buffer)
+    assert other_dataset.total_episodes == 12
+    assert dataset.total_episodes == 10
+
+    dataset.close()
+    assert storage._file is None
+
+    # Once closed, the reads open the file on disk instead of loading it again
+    with storage._read_file() as file:
+        assert file.driver != "core"
+
+    minari.delete_dataset(dataset_id)
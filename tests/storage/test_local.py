@@ -0,0 +1,81 @@
+import os
+
+import gymnasium as gym
+import h5py
+
+import minari
+from minari import DataCollectorV0
+from minari.storage.datasets_root_dir import get_dataset_path
+from minari.storage.local import _metadata_cache
+from tests.common import create_dummy_dataset_with_collecter_env_helper
+
+
+def _main_file_path(dataset_id):
+    return os.path.join(get_dataset_path(dataset_id), "data", "main_data.hdf5")
+
+
+def test_list_local_datasets_after_update():
+    dataset_id = "cartpole-test-v0"
+    env = DataCollectorV0(gym.make("CartPole-v1"))
+    dataset = create_dummy_dataset_with_collecter_env_helper(
+        dataset_id, env, num_episodes=10
+    )
+    assert minari.list_local_datasets()[dataset_id]["total_episodes"] == 10
+
+    collector_env = DataCollectorV0(gym.make("CartPole-v1"))
+    collector_env.reset(seed=42)
+    for _ in range(5):
+        terminated, truncated = False, False
+        while not terminated and not truncated:
+            action = collector_env.action_space.sample()
+            _, _, terminated, truncated, _ = collector_env.step(action)
+        collector_env.reset()
+    dataset.update_dataset_from_collector_env(collector_env)
+
+    assert minari.list_local_datasets()[dataset_id]["total_episodes"] == 15
+
+    minari.delete_dataset(dataset_id)
+
+
+def test_delete_dataset_evicts_metadata():
+    dataset_id = "cartpole-test-v0"
+    env = DataCollectorV0(gym.make("CartPole-v1"))
+    create_dummy_dataset_with_collecter_env_helper(dataset_id, env, num_episodes=10)
+
+    assert dataset_id in minari.list_local_datasets()
+    assert _main_file_path(dataset_id) in _metadata_cache
+
+    minari.delete_dataset(dataset_id)
+    assert _main_file_path(dataset_id) not in _metadata_cache
+    assert dataset_id not in minari.list_local_datasets()
+
+
+def test_list_local_datasets_after_compatible_listing():
+    dataset_id = "cartpole-test-v0"
+    env = DataCollectorV0(gym.make("CartPole-v1"))
+    create_dummy_dataset_with_collecter_env_helper(dataset_id, env, num_episodes=10)
+
+    with h5py.File(_main_file_path(dataset_id), "a") as f:
+        f.attrs["minari_version"] = "<0.0.1"
+        metadata = dict(f.attrs.items())
+
+    assert dataset_id not in minari.list_local_datasets(compatible_minari_version=True)
+
+    local_datasets = minari.list_local_datasets()
+    assert dataset_id in local_datasets
+    assert local_datasets[dataset_id].keys() == metadata.keys()
+    assert local_datasets[dataset_id]["total_episodes"] == 10
+
+    minari.delete_dataset(dataset_id)
+
+
+def test_list_local_dataset_ids(tmp_path, monkeypatch):
+    monkeypatch.setenv("MINARI_DATASETS_PATH", str(tmp_path))
+    for dataset_id in ("b-dataset-v0", "a-dataset-v0", ".hidden-dataset-v0"):
+        os.makedirs(tmp_path / dataset_id / "data")
+    os.makedirs(tmp_path / "no-data-dataset-v0" / "other")
+    (tmp_path / "stray-file-v0").write_text("")
+    (tmp_path / "data-file-dataset-v0").mkdir()
+    (tmp_path / "data-file-dataset-v0" / "data").write_text("")
+
+    assert minari.list_local_dataset_ids() == ["a-dataset-v0", "b-dataset-v0"]
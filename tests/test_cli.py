@@ -2,7 +2,7 @@ import pytest
 from typer.testing import CliRunner
 
 from minari.cli import app
-from minari.storage.local import delete_dataset, list_local_datasets
+from minari.storage.local import delete_dataset, list_local_dataset_ids
 from tests.dataset.test_dataset_download import get_latest_compatible_dataset_id
 
 
@@ -31,7 +31,7 @@ def test_dataset_download_then_delete(dataset_id: str):
     """
     # might have to clear up the local dataset first.
     # ideally this seems like it could just be handled by the tests
-    if dataset_id in list_local_datasets():
+    if dataset_id in list_local_dataset_ids():
         delete_dataset(dataset_id)
 
     result = runner.invoke(app, ["download", dataset_id])
@@ -1,3 +1,4 @@
+import os
 from typing import Optional
 
 import gymnasium as gym
@@ -7,6 +8,7 @@ from packaging.specifiers import SpecifierSet
 
 import minari
 from minari import DataCollectorV0, MinariDataset
+from minari.dataset.minari_storage_soa import MinariStorageSoA
 from minari.utils import combine_datasets, combine_minari_version_specifiers
 
 
@@ -106,7 +108,7 @@ def test_combine_datasets():
     num_datasets, num_episodes = 5, 10
     test_datasets_ids = [f"cartpole-test-{i}-v0" for i in range(num_datasets)]
 
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     # generating multiple test datasets
     for dataset_id in test_datasets_ids:
         if dataset_id in local_datasets:
@@ -158,7 +160,7 @@ def test_combine_datasets():
         f"cartpole-test-{i}-v0" for i in range(len(dataset_max_episode_steps))
     ]
 
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     # generating multiple test datasets
     for dataset_id, max_episode_steps in zip(
         test_datasets_ids, dataset_max_episode_steps
@@ -231,3 +233,35 @@ def test_combine_minari_version_specifiers(specifier_intersection, version_speci
     intersection = combine_minari_version_specifiers(version_specifiers)
 
     assert specifier_intersection == intersection
+
+
+def test_combine_soa_datasets():
+    test_datasets_ids = ["cartpole-test-0-v0", "cartpole-test-1-v0"]
+
+    local_datasets = minari.list_local_dataset_ids()
+    for dataset_id in test_datasets_ids:
+        if dataset_id in local_datasets:
+            minari.delete_dataset(dataset_id)
+        _generate_dataset_with_collector_env(dataset_id, num_episodes=5)
+
+    # Replace the second dataset file with its SoA version
+    storage = minari.load_dataset(test_datasets_ids[1])._data
+    soa_path = os.path.join(os.path.dirname(storage.data_path), "soa_data.hdf5")
+    MinariStorageSoA.from_storage(storage, soa_path)
+    os.replace(soa_path, storage.data_path)
+
+    test_datasets = [
+        minari.load_dataset(dataset_id) for dataset_id in test_datasets_ids
+    ]
+    if "cartpole-combined-test-v0" in local_datasets:
+        minari.delete_dataset("cartpole-combined-test-v0")
+
+    for copy in (False, True):
+        with pytest.raises(ValueError):
+            combine_datasets(
+                test_datasets, new_dataset_id="cartpole-combined-test-v0", copy=copy
+            )
+        assert "cartpole-combined-test-v0" not in minari.list_local_dataset_ids()
+
+    for dataset_id in test_datasets_ids:
+        minari.delete_dataset(dataset_id)
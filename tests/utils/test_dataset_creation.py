@@ -1,4 +1,3 @@
-import copy
 from collections import OrderedDict
 from typing import Dict
 
@@ -15,6 +14,7 @@ from tests.common import (
     check_env_recovery_with_subset_spaces,
     check_load_and_delete_dataset,
     register_dummy_envs,
+    sample_actions,
 )
 
 
@@ -37,7 +37,7 @@ def test_generate_dataset_with_collector_env(dataset_id, env_id):
     """Test DataCollectorV0 wrapper and Minari dataset creation."""
     # dataset_id = "cartpole-test-v0"
     # delete the test dataset if it already exists
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -52,8 +52,11 @@ def test_generate_dataset_with_collector_env(dataset_id, env_id):
     for episode in range(num_episodes):
         terminated = False
         truncated = False
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             _, _, terminated, truncated, _ = env.step(action)
             if terminated or truncated:
                 assert not env._buffer[-1]
@@ -104,7 +107,7 @@ def test_generate_dataset_with_external_buffer(dataset_id, env_id):
     # dataset_id = "cartpole-test-v0"
 
     # delete the test dataset if it already exists
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -127,8 +130,11 @@ def test_generate_dataset_with_external_buffer(dataset_id, env_id):
         terminated = False
         truncated = False
 
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             observation, reward, terminated, truncated, _ = env.step(action)
             observations.append(observation)
             actions.append(action)
@@ -137,8 +143,8 @@ def test_generate_dataset_with_external_buffer(dataset_id, env_id):
             truncations.append(truncated)
 
         episode_buffer = {
-            "observations": copy.deepcopy(observations),
-            "actions": copy.deepcopy(actions),
+            "observations": list(observations),
+            "actions": list(actions),
             "rewards": np.asarray(rewards),
             "terminations": np.asarray(terminations),
             "truncations": np.asarray(truncations),
@@ -215,7 +221,7 @@ def test_generate_dataset_with_space_subset_external_buffer():
         }
     )
 
-    local_datasets = minari.list_local_datasets()
+    local_datasets = minari.list_local_dataset_ids()
     if dataset_id in local_datasets:
         minari.delete_dataset(dataset_id)
 
@@ -238,8 +244,11 @@ def test_generate_dataset_with_space_subset_external_buffer():
         terminated = False
         truncated = False
 
+        episode_actions = iter(
+            sample_actions(env.action_space, env.spec.max_episode_steps)
+        )
         while not terminated and not truncated:
-            action = env.action_space.sample()  # User-defined policy function
+            action = next(episode_actions)  # User-defined policy function
             observation, reward, terminated, truncated, _ = env.step(action)
             observations.append(_space_subset_helper(observation))
             actions.append(_space_subset_helper(action))
@@ -248,8 +257,8 @@ def test_generate_dataset_with_space_subset_external_buffer():
             truncations.append(truncated)
 
         episode_buffer = {
-            "observations": copy.deepcopy(observations),
-            "actions": copy.deepcopy(actions),
+            "observations": list(observations),
+            "actions": list(actions),
             "rewards": np.asarray(rewards),
             "terminations": np.asarray(terminations),
             "truncations": np.asarray(truncations),